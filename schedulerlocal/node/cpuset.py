@@ -1,4 +1,5 @@
 from json import loads
+import numpy as np
 
 class ServerCpu(object):
     """
@@ -167,6 +168,8 @@ class ServerCpuSet(object):
         List of CPU
     distances : dict()
         List of CPU
+    distance_matrix : np.ndarray
+        Distances as a 2D array indexed by CPUID, built with distances
     host_count: int
         Count of CPU on host, without consideration on include/exclude list
 
@@ -188,6 +191,7 @@ class ServerCpuSet(object):
         self.cpu_list = kwargs['cpu_list'] if 'cpu_list' in kwargs else list()
         self.distances = kwargs['distances'] if 'distances' in kwargs else dict()
         self.host_count = kwargs['host_count'] if 'host_count' in kwargs else None
+        self.distance_matrix = None
 
     def add_cpu(self, cpu : ServerCpu):
         """Add a ServerCpu object
@@ -216,6 +220,7 @@ class ServerCpuSet(object):
                 single_cpu_distances[other_cpu.get_cpu_id()] = cpu.compute_distance_to_cpu(other_cpu, self.numa_distances)
             # Reorder distances from the closest one to the farthest one 
             self.distances[cpu.get_cpu_id()] = {k:v for k, v in sorted(single_cpu_distances.items(), key=lambda item: item[1])}
+        self.distance_matrix = self.__build_distance_matrix()
         return self
 
     def load_from_json(self, json : str):
@@ -237,6 +242,7 @@ class ServerCpuSet(object):
         self.distances = {int(k):{int(kprime):vprime for kprime,vprime in v.items()} for k,v in raw_object['distances'].items()}
         self.cpu_list = list()
         self.host_count = raw_object['host_count']
+        self.distance_matrix = None
         for raw_cpu in raw_object['cpu_list']: self.cpu_list.append(ServerCpu(**raw_cpu))
         return self
 
@@ -277,6 +283,32 @@ class ServerCpuSet(object):
         if not self.distances: raise ValueError('Distances weren\'t previously build')
         return self.distances
 
+    def get_distance_matrix(self):
+        """Return distances as a 2D array indexed by CPUID (raise an exception if werent previously build with build_distances() method)
+        ----------
+        """
+        if self.distance_matrix is None:
+            self.get_distances() # Health check
+            self.distance_matrix = self.__build_distance_matrix()
+        return self.distance_matrix
+
+    def __build_distance_matrix(self):
+        """Convert distances to a contiguous 2D array indexed by CPUID, using the smallest unsigned type fitting
+        distances (uint8 on usual topologies). Distance of a CPU to itself is set to 0
+        ----------
+
+        Returns
+        -------
+        matrix : np.ndarray
+            Distances matrix
+        """
+        size = max(self.distances.keys(), default=-1) + 1
+        max_distance = max([max(cpu_distances.values(), default=0) for cpu_distances in self.distances.values()], default=0)
+        matrix = np.zeros((size, size), dtype=np.min_scalar_type(max_distance))
+        for cpu_id, cpu_distances in self.distances.items():
+            matrix[cpu_id, list(cpu_distances.keys())] = list(cpu_distances.values())
+        return matrix
+
     def get_allowed(self):
         """Return usable CPU count for VMs
         ----------
@@ -1,5 +1,12 @@
-def get_cpus_with_weight(cpuset, distance_max, from_list : list, to_list : list, exclude_max : bool = True):
+import numpy as np
+try:
+    from numba import njit
+except ImportError: # numba is optional, numpy implementation is used otherwise
+    njit = None
+
+def get_cpus_with_weight(cpuset, distance_max, from_list : list, to_list : list, exclude_max : bool = True, top_k : int = None):
     """Computer the average distance of CPU presents in from_list to the one in to_list
+    Computation is performed on the cpuset distance matrix (JIT-compiled if numba is available)
     ----------
 
     Parameters
@@ -10,31 +17,139 @@ def get_cpus_with_weight(cpuset, distance_max, from_list : list, to_list : list,
         list of ServerCPU
     exclude_max : bool (optional)
         Should CPU having a distance value higher than the one fixed in max_distance attribute being disregarded
-    
+    top_k : int (optional)
+        Only return the top_k CPU having the lowest average distance (none if lower or equal to 0)
+
     Returns
     -------
-    distance : dict
-        Dict of CPUID (as key) with average distance being computed
+    distance : list
+        List of tuple (ServerCPU, average distance) ordered from the closest CPU to the farthest one (ties keep from_list order)
     """
-    computed_distances = dict()
-    for available_cpu in from_list:
-        total_distance = 0
-        total_count = 0
-
-        exclude_identical = False
-        for subset_cpu in to_list:
-            if subset_cpu == available_cpu: 
-                exclude_identical = True
-                break
-
-            distance = cpuset.get_distance_between_cpus(subset_cpu, available_cpu)
-            if exclude_max and (distance >= distance_max): continue
+    from_ids = np.fromiter((cpu.get_cpu_id() for cpu in from_list), dtype=np.int32, count=len(from_list))
+    to_ids   = np.fromiter((cpu.get_cpu_id() for cpu in to_list), dtype=np.int32, count=len(to_list))
+
+    # CPU from from_list being also present in to_list are disregarded
+    from_index = np.flatnonzero(np.isin(from_ids, to_ids, invert=True))
+    if from_index.size <= 0: return list()
+    from_ids = from_ids[from_index]
+
+    # Distance is read from to_list CPU to from_list CPU (topology distances may be asymmetric)
+    total_distance, total_count = sum_distances(cpuset.get_distance_matrix().T, from_ids, to_ids, distance_max, exclude_max)
+    average = np.divide(total_distance, total_count, out=np.zeros(from_ids.size), where=total_count>0)
+
+    closest = argsort_top_k(average, top_k)
+    return [(from_list[index], distance) for index, distance in zip(from_index[closest].tolist(), average[closest].tolist())]
+
+def argsort_top_k(values : np.ndarray, top_k : int = None):
+    """Return indices of the top_k lowest values, in ascending order (ties keep index order)
+    When top_k is lower than the number of values, a partition is used instead of a full sort
+    ----------
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values to sort
+    top_k : int (optional)
+        Number of indices to return. All indices are returned if None, none if lower or equal to 0
+
+    Returns
+    -------
+    indices : np.ndarray
+        Indices of values, ordered
+    """
+    if top_k is not None and top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if (top_k is None) or (top_k >= values.size):
+        return np.argsort(values, kind='stable')
+
+    kth_value = np.partition(values, top_k-1)[top_k-1]
+    lower = np.flatnonzero(values < kth_value)
+    equal = np.flatnonzero(values == kth_value)[:top_k-lower.size]
+    selected = np.concatenate((lower, equal))
+    return selected[np.argsort(values[selected], kind='stable')]
+
+def get_closest_cpus_greedy(cpuset, from_list : list, to_list : list, count : int):
+    """Iteratively pick from from_list the CPU having the lowest average distance to the CPU in to_list, each CPU picked being
+    then considered as part of to_list. Distances are summed once, and updated incrementally with each CPU picked
+    ----------
+
+    Parameters
+    ----------
+    from_list : list
+        list of ServerCPU
+    to_list : list
+        list of ServerCPU
+    count : int
+        Number of CPU to pick
 
-            total_distance+=distance
-            total_count+=1
+    Returns
+    -------
+    picked : list
+        List of ServerCPU picked, in order of selection (ties keep from_list order)
+    """
+    from_ids = np.fromiter((cpu.get_cpu_id() for cpu in from_list), dtype=np.int32, count=len(from_list))
+    to_ids   = np.fromiter((cpu.get_cpu_id() for cpu in to_list), dtype=np.int32, count=len(to_list))
+
+    # CPU from from_list being also present in to_list are disregarded
+    from_index = np.flatnonzero(np.isin(from_ids, to_ids, invert=True))
+    from_ids = from_ids[from_index]
+
+    # Average distances share the same denominator at each step: comparing sums is enough
+    distance_matrix = cpuset.get_distance_matrix().T # as [from, to]: distance is read from to_list CPU (may be asymmetric)
+    total_distance = distance_matrix[np.ix_(from_ids, to_ids)].sum(axis=1, dtype=np.float64)
+    picked = list()
+    for _ in range(min(count, from_ids.size)):
+        closest = int(np.argmin(total_distance))
+        picked.append(from_list[from_index[closest]])
+        total_distance += distance_matrix[from_ids, from_ids[closest]]
+        total_distance[closest] = np.inf
+    return picked
+
+def sum_distances_numpy(distance_matrix : np.ndarray, from_ids : np.ndarray, to_ids : np.ndarray, distance_max : int, exclude_max : bool):
+    """Sum distances from each CPUID of from_ids to CPUID of to_ids (vectorized implementation)
+    ----------
 
-        if exclude_identical : continue
-        if total_count <= 0: computed_distances[available_cpu.get_cpu_id()] = 0
-        elif total_distance>=0: computed_distances[available_cpu.get_cpu_id()] = total_distance/total_count
+    Parameters
+    ----------
+    distance_matrix : np.ndarray
+        Distances indexed by CPUID, as [from, to]
+    from_ids : np.ndarray
+        CPUID to compute distance from
+    to_ids : np.ndarray
+        CPUID to compute distance to
+    distance_max : int
+        Distance threshold used when exclude_max is set
+    exclude_max : bool
+        Should distances higher than distance_max being disregarded
+
+    Returns
+    -------
+    total_distance : np.ndarray
+        Sum of distances considered, for each CPUID of from_ids
+    total_count : np.ndarray
+        Number of distances considered, for each CPUID of from_ids
+    """
+    distances = distance_matrix[np.ix_(from_ids, to_ids)]
+    if exclude_max:
+        mask = distances < distance_max
+    else:
+        mask = np.ones(distances.shape, dtype=bool)
+    return np.where(mask, distances, 0).sum(axis=1), mask.sum(axis=1)
+
+def sum_distances_loop(distance_matrix : np.ndarray, from_ids : np.ndarray, to_ids : np.ndarray, distance_max : int, exclude_max : bool):
+    """Sum distances from each CPUID of from_ids to CPUID of to_ids (loop implementation, meant to be JIT-compiled)
+    Same parameters and returns as sum_distances_numpy()
+    ----------
+    """
+    total_distance = np.zeros(from_ids.size, dtype=np.int64)
+    total_count    = np.zeros(from_ids.size, dtype=np.int64)
+    for i in range(from_ids.size):
+        from_id = from_ids[i]
+        for j in range(to_ids.size):
+            distance = distance_matrix[from_id, to_ids[j]]
+            if exclude_max and (distance >= distance_max): continue
+            total_distance[i] += distance
+            total_count[i] += 1
+    return total_distance, total_count
 
-    return computed_distances
\ No newline at end of file
+sum_distances = njit(cache=True)(sum_distances_loop) if njit is not None else sum_distances_numpy
@@ -23,6 +23,7 @@ class ServerCpuSetEncoder(JSONEncoder):
         if type(o) is not ServerCpuSet:
             return
         as_dict = dict(o.__dict__)
+        del as_dict['distance_matrix'] # rebuilt from distances
         as_dict['cpu_list'] = [self.convert_cpu_to_dict(cpu) for cpu in o.__dict__['cpu_list']]
         return as_dict
 
@@ -1,15 +1,6 @@
-import tensorflow as tf
 import numpy as np
-import math, random, os
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3' 
-from statistics import mean, stdev
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, LSTM
-from sklearn.metrics import mean_squared_error
-# Determinism consideration
-tf.random.set_seed(10)
-tf.keras.utils.set_random_seed(10)
-tf.config.experimental.enable_op_determinism()
+from numpy.lib.stride_tricks import sliding_window_view
+import math, os
 
 class Predictor(object):
     """
@@ -41,14 +32,26 @@ class PredictorMax(Predictor):
 
 class PredictorScrooge(Predictor):
 
+    QUIESCENCE_CHECKS = ('stat', 'lstm', 'vw')
+    VW_CURSOR_SIZE = 3 # Number of labels used to locate samples already learned by the online regressor
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.last_value  = None
         self.strike      = 5
         self.strike_bnds = (3,6)
         self.strike_step = 1
-        self.config    = "TODO"
-        self.threshold = "TODO"
+        self.config    = kwargs['config'] if 'config' in kwargs else "TODO"
+        self.threshold = kwargs['threshold'] if 'threshold' in kwargs else "TODO"
+        self.quiescence = kwargs['quiescence'] if 'quiescence' in kwargs else 'stat' # Quiescence check used to update the strike
+        if self.quiescence not in self.QUIESCENCE_CHECKS: raise ValueError('Unknown quiescence check', self.quiescence, self.QUIESCENCE_CHECKS)
+        if (self.quiescence != 'stat') and not self.__is_configured():
+            raise ValueError('Numeric config and threshold are required by quiescence check', self.quiescence)
+        self.model = None # LSTM model, trained once
+        self.model_setting = None # (config, look_back) used to train the model
+        self.tf_loaded   = False
+        self.vw_workspace = None # Online regressor, as a VW workspace updated incrementally
+        self.vw_cursor = None # Last labels learned by the online regressor
 
     def predict(self, data : list, recompute : bool = True):
         if (self.last_value is None) or recompute:
@@ -57,12 +60,24 @@ class PredictorScrooge(Predictor):
                 self.last_value = None # not defining it as last value to force recompute
                 return 0 
             self.__update_strike(data)
-            self.last_value = mean(data) + self.strike * stdev(data)
+            data_mean, data_stdev = self.__mean_and_stdev(data)
+            self.last_value = data_mean + self.strike * data_stdev
         return self.last_value
 
+    def __mean_and_stdev(self, data : list):
+        # Single array conversion for both statistics, stdev is the sample one (as statistics.stdev)
+        data = np.asarray(data, dtype=np.float64)
+        return float(data.mean()), float(data.std(ddof=1))
+
     def __update_strike(self, data):
         updated_strike = self.strike
-        if self.__is_quescient(data):
+        if self.quiescence == 'lstm':
+            is_quescient = self.__is_quescient_lstm(data)
+        elif self.quiescence == 'vw':
+            is_quescient = self.__is_quescient_vw(data)
+        else:
+            is_quescient = self.__is_quescient(data)
+        if is_quescient:
             updated_strike -= self.strike_step
         else:
             updated_strike += self.strike_step
@@ -71,9 +86,20 @@ class PredictorScrooge(Predictor):
         if updated_strike > self.strike_bnds[1]: updated_strike = self.strike_bnds[1]
         self.strike = updated_strike
 
+    def __is_configured(self):
+        # config and threshold are placeholders until set
+        return isinstance(self.config, (int, float)) and isinstance(self.threshold, (int, float))
+
     def __is_quescient(self, data, debug = False):
-        return True # Too force N-Sigma behavior for now
+        if not self.__is_configured(): return True # Too force N-Sigma behavior while unconfigured
+
+        # Compare variability of old data (2/3) to the one of recent data (1/3)
+        delimit = math.floor((len(data)/3)*2) # 2/3
+        abs_gap = np.abs(np.std(data[:delimit]) - np.std(data[delimit:]))
+        return self.__is_gap_stable(abs_gap=abs_gap, debug=debug)
 
+    def __is_quescient_lstm(self, data, debug = False):
+        # LSTM based alternative to __is_quescient(), kept for comparison purposes (several orders of magnitude slower)
         # TODO: check on enough data and/or last training timestamp?
         look_back = 1
         
@@ -84,6 +110,52 @@ class PredictorScrooge(Predictor):
         print('Test Score: %.2f RMSE' % (test_score))
 
         abs_gap = np.abs(train_score - test_score)
+        return self.__is_gap_stable(abs_gap=abs_gap, debug=debug)
+
+    def __is_quescient_vw(self, data, debug = False):
+        # Online regression alternative to __is_quescient(): the model learns incrementally the old data (2/3) not seen yet
+        look_back = 1
+
+        trainX, trainY, testX, testY = self.__format_data(data=data, look_back=look_back)
+        if (len(trainY) <= 0) or (len(testY) <= 0): return True # Not enough data to assess
+
+        if self.vw_workspace is None:
+            from vowpalwabbit import Workspace
+            self.vw_workspace = Workspace(quiet=True, learning_rate=0.1)
+        unseenX, unseenY = self.__get_unseen_samples(trainX, trainY)
+        for sample, label in zip(unseenX, unseenY):
+            self.vw_workspace.learn(self.__to_vw_example(sample, label))
+        train_score = self.__score_vw(trainX, trainY)
+        test_score = self.__score_vw(testX, testY)
+
+        if debug:
+            print('Train Score: %.2f RMSE' % (train_score))
+            print('Test Score: %.2f RMSE' % (test_score))
+
+        abs_gap = np.abs(train_score - test_score)
+        return self.__is_gap_stable(abs_gap=abs_gap, debug=debug)
+
+    def __get_unseen_samples(self, trainX, trainY):
+        # Old data slides with the history: the last labels learned are searched to locate the first sample not seen yet
+        # (on a repeated pattern, the last occurrence is kept, samples being then indistinguishable)
+        start = 0
+        if (self.vw_cursor is not None) and (len(trainY) >= len(self.vw_cursor)):
+            matches = np.flatnonzero((sliding_window_view(trainY, len(self.vw_cursor)) == self.vw_cursor).all(axis=1))
+            if matches.size > 0: start = matches[-1] + len(self.vw_cursor)
+        self.vw_cursor = np.array(trainY[-self.VW_CURSOR_SIZE:])
+        return trainX[start:], trainY[start:]
+
+    def __score_vw(self, dataX, dataY):
+        # RMSE computed on values scaled back, as __predict_and_score()
+        predictions = np.array([self.vw_workspace.predict(self.__to_vw_example(sample)) for sample in dataX])
+        return np.sqrt(np.mean((self.__pseudo_normalize(predictions, rev=True) - self.__pseudo_normalize(dataY, rev=True))**2))
+
+    def __to_vw_example(self, sample, label = None):
+        # VW text format, features being the look_back values of sample
+        features = ' '.join('x' + str(index) + ':' + str(float(value)) for index, value in enumerate(np.ravel(sample)))
+        return ('' if label is None else str(float(label)) + ' ') + '| ' + features
+
+    def __is_gap_stable(self, abs_gap : float, debug = False):
         threshold_val = self.config*self.threshold
         is_stable = False
         if abs_gap < threshold_val:
@@ -109,14 +181,11 @@ class PredictorScrooge(Predictor):
         return trainX, trainY, testX, testY
 
     def __predict_and_score(self, trainX, trainY, testX, testY, look_back):
-        model = Sequential()
-        model.add(LSTM(4, input_shape=(1, look_back)))
-        model.add(Dense(1))
-        model.compile(loss='mean_squared_error', optimizer='adam')
-        model.fit(trainX, trainY, epochs=100, batch_size=1, verbose=2)
+        from sklearn.metrics import mean_squared_error
+        self.__fit_once(trainX, trainY, look_back)
         # make predictions
-        train_predict = model.predict(trainX)
-        test_predict = model.predict(testX)
+        train_predict = self.model.predict(trainX, verbose=0)
+        test_predict = self.model.predict(testX, verbose=0)
         # invert predictions
         train_predict = self.__pseudo_normalize(train_predict, rev=True)
         trainY = self.__pseudo_normalize([trainY], rev=True)
@@ -127,19 +196,46 @@ class PredictorScrooge(Predictor):
         test_score = np.sqrt(mean_squared_error(testY[0], test_predict[:,0]))
         return train_score, test_score
 
+    def __fit_once(self, trainX, trainY, look_back):
+        # Model is trained on first call only (or on setting change)
+        if (self.model is not None) and (self.model_setting == (self.config, look_back)): return
+        self.__load_tensorflow()
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense, LSTM
+        model = Sequential()
+        model.add(LSTM(4, input_shape=(1, look_back)))
+        model.add(Dense(1))
+        model.compile(loss='mean_squared_error', optimizer='adam', jit_compile=True) # XLA fuses LSTM gates
+        model.fit(trainX, trainY, epochs=20, batch_size=max(1, min(len(trainX), 32)), verbose=0)
+        self.model = model
+        self.model_setting = (self.config, look_back)
+
+    def __load_tensorflow(self):
+        # Tensorflow is only imported when the LSTM path is used, as its import is costly
+        os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+        import tensorflow as tf
+        if not self.tf_loaded:
+            # Determinism consideration
+            tf.random.set_seed(10)
+            tf.keras.utils.set_random_seed(10)
+            tf.config.experimental.enable_op_determinism()
+            self.tf_loaded = True
+        return tf
+
     def __pseudo_normalize(self, data : list, rev : bool = False):
+        data = np.asarray(data, dtype=np.float32)
         if rev:
-            return [value*self.config for value in data]
-        return [value/self.config for value in data]
+            return data*self.config
+        return data/self.config
 
     def __create_dataset(self, dataset, look_back=1):
         """
         convert an array of values into a dataset matrix
-        From https://machinelearningmastery.com/time-series-prediction-lstm-recurrent-neural-networks-python-keras/
+        Adapted from https://machinelearningmastery.com/time-series-prediction-lstm-recurrent-neural-networks-python-keras/
         """
-        dataX, dataY = [], []
-        for i in range(len(dataset)-look_back-1):
-            a = dataset[i:(i+look_back), 0]
-            dataX.append(a)
-            dataY.append(dataset[i + look_back, 0])
-        return np.array(dataX), np.array(dataY)
\ No newline at end of file
+        dataset = np.asarray(dataset).reshape(-1)
+        count = len(dataset)-look_back-1
+        if count <= 0: return np.empty((0, look_back), dtype=dataset.dtype), np.empty(0, dtype=dataset.dtype)
+        dataX = sliding_window_view(dataset, look_back)[:count]
+        dataY = dataset[look_back:look_back+count]
+        return dataX, dataY
@@ -19,6 +19,8 @@ class Subset(object):
         List of consumers
     consumer_dict : dict
         Resources id of consumer
+    _version : int
+        Incremented on each resource or consumer change
 
     Public Methods
     -------
@@ -26,6 +28,8 @@ class Subset(object):
         Add a resource to subset
     remove_res()
         Remove a resource from subset
+    get_version()
+        Get the version of subset content
     get_res()
         Get resources list
     count_res()
@@ -51,6 +55,7 @@ class Subset(object):
         if self.res_list == None: self.res_list = list()
         if self.consumer_list == None: self.consumer_list = list()
         if self.consumer_dict == None: self.consumer_dict = dict()
+        self._version = 0
 
     def get_oversubscription_id(self):
         """Get subset id
@@ -74,6 +79,7 @@ class Subset(object):
         """
         if res in self.res_list: raise ValueError('Cannot add twice a resource', res)
         self.res_list.append(res)
+        self._version += 1
 
     def remove_res(self, res):
         """Remove a resource to subset
@@ -85,6 +91,18 @@ class Subset(object):
             The resource to remove
         """
         self.res_list.remove(res)
+        self._version += 1
+
+    def get_version(self):
+        """Get the version of subset content. Value changes each time resources or consumers are modified
+        ----------
+
+        Return
+        ----------
+        version : int
+            subset version
+        """
+        return self._version
 
     def get_res(self):
         """Get resources list
@@ -179,6 +197,7 @@ class Subset(object):
         if consumer not in self.consumer_list: self.consumer_list.append(consumer)
         if consumer.get_name() not in self.consumer_dict: self.consumer_dict[consumer.get_name()] = list()
         self.consumer_dict[consumer.get_name()].append(res_id)
+        self._version += 1
 
     def remove_consumer(self, consumer):
         """Remove a consumer from subset
@@ -195,6 +214,7 @@ class Subset(object):
             return
         self.consumer_list.remove(consumer)
         del self.consumer_dict[consumer.get_name()]
+        self._version += 1
 
     def count_consumer(self):
         """Count consumers in subset
@@ -788,6 +808,8 @@ class CpuElasticSubset(CpuSubset):
         list of resource usage percentage
     hist_consumers_usage : list
         dict of consumer resource usage percentage
+    market : SubsetMarket
+        Market the subset is registered to, notified of allocation changes
 
 
     Public Methods reimplemented/introduced
@@ -804,10 +826,12 @@ class CpuElasticSubset(CpuSubset):
         # Additional attributes
         self.hist_usage = list()
         self.hist_consumers_usage = dict()
+        self.market = None
         # Retrieve specific configuration
         self.MONITORING_WINDOW = int(os.getenv('SCL_ACT_MONITORING')) #records older than this value are progressively purged
 
     def register_market(self, market : SubsetMarket):
+        self.market = market
         self.oversubscription.register_market(market)
 
     def get_pinning_res(self):
@@ -877,6 +901,18 @@ class CpuElasticSubset(CpuSubset):
             # Manage expired data
             if consumer_uuid in self.hist_consumers_usage: self.__remove_from_list_expired_timestamp(timestamp=timestamp, list_of_timestamp_tuple=self.hist_consumers_usage[consumer_uuid])
 
+    def add_consumer(self, consumer, res_id):
+        """Add a consumer to subset. Should not be called directly. Use deploy() instead
+        ----------
+
+        Parameters
+        ----------
+        consumer : object
+            The consumer to add
+        """
+        super().add_consumer(consumer=consumer, res_id=res_id)
+        if self.market is not None: self.market.update_allocation(actor=self, delta=1)
+
     def remove_consumer(self, consumer):
         """Remove a consumer from subset
         ----------
@@ -886,8 +922,10 @@ class CpuElasticSubset(CpuSubset):
         consumer : object
             The consumer to remove
         """
+        allocation_removed = len(self.consumer_dict[consumer.get_name()]) if consumer in self.consumer_list else 0
         super().remove_consumer(consumer=consumer)
         if (consumer is not None and consumer.get_uuid() in self.hist_consumers_usage): del self.hist_consumers_usage[consumer.get_uuid()]
+        if (self.market is not None) and allocation_removed: self.market.update_allocation(actor=self, delta=-allocation_removed)
 
     def __remove_from_list_expired_timestamp(self, timestamp, list_of_timestamp_tuple : list):
         """Parse a list of tuple where the first record is a timestamp and remove all values being older than
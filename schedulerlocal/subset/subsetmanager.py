@@ -467,21 +467,20 @@ class CpuSubsetManager(SubsetManager):
         cpu_list : list
             List of available CPU ordered by their distance
         """
-        cpuid_dict = {cpu.get_cpu_id():cpu for cpu in self.cpuset.get_cpu_list()}
         available_list = self.__get_available_cpus()
-        available_cpu_weighted = cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, distance_max=self.distance_max, from_list=available_list, to_list=subset.get_res(), exclude_max=False)
+        available_cpu_weighted = dict(cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, distance_max=self.distance_max, from_list=available_list, to_list=subset.get_res(), exclude_max=False))
 
         # Now, we penalize cores that are closer to others subset
         penalty = max(available_cpu_weighted.values()) if available_cpu_weighted else 0
         for other_subset in self.collection.get_subsets():
             if other_subset.get_oversubscription_id() == subset.get_oversubscription_id(): continue
 
-            other_cpu_weighted = cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, distance_max=self.distance_max, from_list=available_list, to_list=other_subset.get_res(), exclude_max=False)
-            for cpuid in available_cpu_weighted.keys():
-                if other_cpu_weighted[cpuid] < available_cpu_weighted[cpuid]: available_cpu_weighted[cpuid] += penalty
+            other_cpu_weighted = dict(cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, distance_max=self.distance_max, from_list=available_list, to_list=other_subset.get_res(), exclude_max=False))
+            for cpu in available_cpu_weighted.keys():
+                if other_cpu_weighted[cpu] < available_cpu_weighted[cpu]: available_cpu_weighted[cpu] += penalty
 
-        # Reorder distances from the closest one to the farthest one
-        return [cpuid_dict[cpuid] for cpuid, _ in sorted(available_cpu_weighted.items(), key=lambda item: item[1])]
+        # Reorder distances from the closest one to the farthest one (ties keep available list order)
+        return [cpu for cpu, _ in sorted(available_cpu_weighted.items(), key=lambda item: item[1])]
 
     def __get_farthest_available_cpus(self):
         """When considering subset allocation. One may want to start from the farthest CPU possible
@@ -493,12 +492,11 @@ class CpuSubsetManager(SubsetManager):
         ordered_cpu : list
             List of available CPU ordered in reverse by their distance
         """
-        cpuid_dict = {cpu.get_cpu_id():cpu for cpu in self.cpuset.get_cpu_list()}
         available_list = self.__get_available_cpus()
         allocated_list = self.collection.get_res()
-        available_cpu_weighted = cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, distance_max=self.distance_max, from_list=available_list, to_list=allocated_list, exclude_max=False)
-        # Reorder distances from the farthest one to the closest one
-        return [cpuid_dict[cpuid] for cpuid, v in sorted(available_cpu_weighted.items(), key=lambda item: item[1], reverse=True)]
+        available_cpu_weighted = dict(cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, distance_max=self.distance_max, from_list=available_list, to_list=allocated_list, exclude_max=False))
+        # Reorder distances from the farthest one to the closest one (ties keep available list order)
+        return [cpu for cpu, _ in sorted(available_cpu_weighted.items(), key=lambda item: item[1], reverse=True)]
 
     def __get_available_cpus(self):
         """Retrieve the list of CPUs without subset attribution
@@ -4,8 +4,9 @@ if TYPE_CHECKING:
     from schedulerlocal.subset.subset import CpuElasticSubset
 
 import schedulerlocal.node.cpusetutils as cpuset_utils
-from schedulerlocal.domain.domainentity import DomainEntity
-from math import ceil, floor
+import bisect, heapq, logging
+
+logger = logging.getLogger(__name__)
 
 class SubsetMarket(object):
     """
@@ -18,9 +19,24 @@ class SubsetMarket(object):
         Market actors (the subset) associated to their priority
     actors : list
         List of actors sorted by in a descending order based on their priority
+    actors_reversed : list
+        List of actors sorted by in an ascending order based on their priority
     actors_fallback : Actor
         Actor to borrow from when no resources are available
-    current_orders : dict 
+    current_orders : list
+        Heap of pending orders, as tuple (negated priority, sequence, actor, request)
+    _pending_actors : set
+        Actors having passed an order not executed yet
+    _order_seq : int
+        Sequence number of orders, used to keep the heap stable for actors of same priority
+    _neg_priorities : list
+        Negated priority of actors, in the same order as actors (i.e. ascending)
+    _default_resources : tuple
+        CPU managed by the market (cpuset is static)
+    _cpu_count : int
+        Number of CPU managed by the market
+    _total_allocation : int
+        Sum of actors allocation, updated incrementally
 
     Public Methods
     -------
@@ -28,18 +44,31 @@ class SubsetMarket(object):
         Pass a quantity order (in term of resources needed) to the market
     execute_orders()
         Execute all orders stored
+    update_allocation()
+        Notify the market of a change in an actor allocation
+    rebuild_allocation()
+        Recompute the total allocation of actors from scratch
     """
+    __slots__ = ('subset_manager', 'cpuset', 'actors_priority', 'actors', 'actors_reversed', 'actor_fallback', 'current_orders', 'effective',
+                 '_pending_actors', '_order_seq', '_neg_priorities', '_default_resources', '_cpu_count', '_total_allocation')
 
     def __init__(self, **kwargs):
         self.subset_manager = kwargs['subset_manager']
         self.cpuset = kwargs['cpuset']
         self.actors_priority = dict()
         self.actors          = list()
+        self.actors_reversed = list()
         self.actor_fallback  = None
-        self.current_orders  = dict()
+        self.current_orders  = list()
+        self._pending_actors = set()
+        self._order_seq = 0
         self.effective = None
+        self._neg_priorities = list()
+        self._default_resources = tuple(self.cpuset.get_cpu_list())
+        self._cpu_count = len(self._default_resources)
+        self._total_allocation = 0
 
-    def is_market_effective(self, recompute : bool = True):
+    def is_market_effective(self, recompute : bool = True, rebuild : bool = False):
         """Return a boolean VM based on market mechanism being currently applied or not
         ----------
 
@@ -47,31 +76,55 @@ class SubsetMarket(object):
         ----------
         recompute : bool
             Force to recompute condition
+        rebuild : bool (opt)
+            Also recompute the actors total allocation from scratch (fallback to incremental updates)
 
         Returns
         -------
         status : bool
             True if effective, False otherwise
         """
-        if (self.effective is None) or recompute:
-            allocation = 0
-            for actor in self.actors:
-                allocation += actor.get_allocation()
-                
+        if rebuild: self.rebuild_allocation()
+        if (self.effective is None) or recompute or rebuild:
             # Introduce a margin to avoid too frequent switch on low oversubscribed environment
             margin=1
             if self.effective == True:
                 margin=0.8
 
-            if allocation > (len(self.cpuset.get_cpu_list())*margin):
-                self.effective = True
-            else:
-                self.effective = False
+            self.effective = self._total_allocation > (self._cpu_count*margin)
 
         return self.effective
 
+    def update_allocation(self, actor : CpuElasticSubset, delta : int):
+        """Update the total allocation of actors. Must be called on each allocation change of an actor
+        ----------
+
+        Parameters
+        ----------
+        actor : Subset
+            subset whose allocation changed
+        delta : int
+            Allocation variation (may be negative)
+        """
+        if actor in self.actors_priority: self._total_allocation += delta
+
+    def rebuild_allocation(self):
+        """Recompute the total allocation of actors from scratch (resync of the incremental update_allocation())
+        ----------
+
+        Returns
+        -------
+        allocation : int
+            Sum of actors allocation
+        """
+        total_allocation = sum(actor.get_allocation() for actor in self.actors)
+        if total_allocation != self._total_allocation:
+            logger.warning('market allocation drifted: %s instead of %s', self._total_allocation, total_allocation)
+            self._total_allocation = total_allocation
+        return self._total_allocation
+
     def get_default_resources(self):
-        return self.cpuset.get_cpu_list()
+        return self._default_resources
 
     def register_actor(self, actor : CpuElasticSubset, priority : int):
         """Register an actor (associated to its priority) in the Market system
@@ -84,20 +137,15 @@ class SubsetMarket(object):
         priority : int
             Priority value (index, the higher, the more important it is)
         """
-        if actor in self.actors: return
+        if actor in self.actors_priority: return
 
-        # Order list of actors based on priority
-        index_to_insert = -1
-        for index, existing_actor in enumerate(self.actors):
-            if self.actors_priority[existing_actor] < priority:
-                index_to_insert = index
-                break
-        
+        # Order list of actors based on priority (binary search, after actors of same priority)
+        index_to_insert = bisect.bisect_right(self._neg_priorities, -priority)
+        self._neg_priorities.insert(index_to_insert, -priority)
+        self.actors.insert(index_to_insert, actor)
         self.actors_priority[actor] = priority
-        if index_to_insert < 0 :
-            self.actors.append(actor)
-        else:
-            self.actors.insert(index_to_insert, actor)
+        self._total_allocation += actor.get_allocation()
+        self.actors_reversed = list(reversed(self.actors))
         self.actor_fallback = self.actors[-1]
 
     def remove_actor(self, actor : CpuElasticSubset):
@@ -109,10 +157,13 @@ class SubsetMarket(object):
         actor : Subset
             subset to remove from the market
         """
+        index_to_remove = self.actors.index(actor, bisect.bisect_left(self._neg_priorities, -self.actors_priority[actor]))
+        del self.actors[index_to_remove]
+        del self._neg_priorities[index_to_remove]
         del self.actors_priority[actor]
-        self.actors.remove(actor)
-        if not self.actors:
-            self.actor_fallback = None
+        self._total_allocation -= actor.get_allocation()
+        self.actors_reversed = list(reversed(self.actors))
+        self.actor_fallback = self.actors[-1] if self.actors else None
 
     def pass_order(self, actor : CpuElasticSubset, request : int):
         """Register an order for the next market session
@@ -125,9 +176,12 @@ class SubsetMarket(object):
         request : int
             Resource requested (can be 0)
         """
-        if actor in self.current_orders:
+        if actor in self._pending_actors:
             raise ValueError('An order was already passed (but not executed) for this actor')
-        self.current_orders[actor] = request
+        self._pending_actors.add(actor)
+        if request > 0: # Nothing to execute otherwise
+            heapq.heappush(self.current_orders, (-self.actors_priority.get(actor, 0), self._order_seq, actor, request))
+            self._order_seq += 1
 
     def execute_orders(self):
         """Execute orders currently stored and clear them
@@ -138,15 +192,15 @@ class SubsetMarket(object):
         actor : Subset
             subset to remove from the market
         """
-        removed_from_market = list()
-        for actor in self.actors:  # Ordered from the high priority to the low-priority
-            if (actor in self.current_orders and self.current_orders[actor]>0): #need core(s)
-                print('MarketDebug: executing order', actor.oversubscription.perf, self.current_orders[actor])
-                cpu_affected = self.__get_renters(requester=actor, quantity=self.current_orders[actor], to_ignore=removed_from_market)
-                removed_from_market.append(actor)
-                del self.current_orders[actor]
+        removed_from_market = set()
+        while self.current_orders:  # Popped from the high priority to the low-priority
+            _, _, actor, request = heapq.heappop(self.current_orders)
+            if actor not in self.actors_priority: continue # Actor left the market since its order
+            if logger.isEnabledFor(logging.DEBUG): logger.debug('MarketDebug: executing order %s %s', actor.oversubscription.perf, request)
+            cpu_affected = self.__get_renters(requester=actor, quantity=request, to_ignore=removed_from_market)
+            removed_from_market.add(actor)
         ## Clean orders
-        self.current_orders.clear()
+        self._pending_actors.clear()
 
     def reclaim_from_all(self, quantity : int, simulation : bool, requester : CpuElasticSubset = None):
         """Try to retrieve a specific resource quantity from subsets for given requester
@@ -166,9 +220,9 @@ class SubsetMarket(object):
         cpu_affected : List
             List of CPU affected
         """
-        return self.__get_renters(requester=requester, quantity=quantity, to_ignore=list(), simulation=simulation)
+        return self.__get_renters(requester=requester, quantity=quantity, to_ignore=set(), simulation=simulation)
 
-    def __get_renters(self, requester : CpuElasticSubset, quantity : int, to_ignore : list, simulation : bool = False):
+    def __get_renters(self, requester : CpuElasticSubset, quantity : int, to_ignore : set, simulation : bool = False):
         """Find appropriate renter(s) for the resource request
         ----------
 
@@ -178,8 +232,8 @@ class SubsetMarket(object):
             subset requesting the resources
         quantity : int
             Quantity requested (positive amount)
-        to_ignore : list
-            List of actors to exclude from candidate list
+        to_ignore : set
+            Set of actors to exclude from candidate list
         simulation : bool
             Should resources be actually transfered or not
 
@@ -195,29 +249,26 @@ class SubsetMarket(object):
         count_to_reclaim = quantity
         cpu_affected = list()
 
-        # First, check unallocated resources
-        while True:
-            candidates = self.subset_manager.get_available()
-            if count_to_reclaim <= 0 or (not candidates):
-                break
-            
-            distance_from = cpu_affected if requester is None else requester.get_res()
-            closest = self.__get_ordered_cpu_list(list_to_sort=candidates, distance_from=distance_from)[0]
-
-            cpu_affected.append(closest)
-            count_to_reclaim -= 1
-            if (not simulation) and (requester != None): requester.add_res(closest)
+        # First, check unallocated resources (closest one first, each CPU picked being considered for the next choice)
+        candidates = self.subset_manager.get_available()
+        if candidates and (count_to_reclaim > 0):
+            distance_from = list() if requester is None else requester.get_res()
+            cpu_affected = cpuset_utils.get_closest_cpus_greedy(cpuset=self.cpuset, from_list=candidates, to_list=distance_from, count=count_to_reclaim)
+            count_to_reclaim -= len(cpu_affected)
 
-        if cpu_affected and (not simulation) and (requester != None): requester.sync_pinning()
+            if cpu_affected and (not simulation) and (requester != None):
+                for cpu in cpu_affected: requester.add_res(cpu)
+                requester.sync_pinning()
         if count_to_reclaim <= 0: return cpu_affected
         
         # Second, ask neighbors nicely    
-        for actor in reversed(self.actors): # Ordered from the low-priority to the high priority
-            if (actor == requester) or (actor in to_ignore):
+        for actor in self.actors_reversed: # Ordered from the low-priority to the high priority
+            if (actor is requester) or (actor in to_ignore):
                 continue
 
-            if actor.oversubscription.get_available() >= 0:
-                reclaim_from_specific_actor = min( actor.oversubscription.get_available(), count_to_reclaim)
+            available = actor.oversubscription.get_available()
+            reclaim_from_specific_actor = min(available, count_to_reclaim)
+            if reclaim_from_specific_actor > 0: # Nothing to transfer otherwise
                 count_to_reclaim -= reclaim_from_specific_actor
                 cpu_affected.extend(self.__transfer_resources(receiver=requester, sender=actor, amount=reclaim_from_specific_actor, simulation=simulation))
 
@@ -254,34 +305,28 @@ class SubsetMarket(object):
         cpu_affected : List
             List of CPU affected
         """
-        cpu_affected = list()
-
         # Specific case, receiver is not created yet
         if receiver is None: 
             cpu_affected = sender.get_res()[-amount:]
-            if not simulation:
-                for cpu in cpu_affected: 
-                    sender.remove_res(cpu)
-                sender.sync_pinning()
+            if simulation: return cpu_affected
+            for cpu in cpu_affected: 
+                sender.remove_res(cpu)
+            sender.sync_pinning()
             return cpu_affected
 
         # Generic case, choose from sender the closest core to receiver
-        candidates_ordered = self.__get_ordered_cpu_list(list_to_sort=sender.get_res(), distance_from=receiver.get_res())
-        for index, cpu in enumerate(candidates_ordered):
-            if index >= amount:
-                break
-            cpu_affected.append(cpu)
-            if not simulation:
-                sender.remove_res(cpu)
-                receiver.add_res(cpu)
+        cpu_affected = self.__get_ordered_cpu_list(list_to_sort=sender.get_res(), distance_from=receiver.get_res(), count=amount)
+        if simulation: return cpu_affected
 
-        if not simulation: # avoid the sync in the loop
-            sender.sync_pinning()
-            receiver.sync_pinning()
+        for cpu in cpu_affected:
+            sender.remove_res(cpu)
+            receiver.add_res(cpu)
+        # avoid the sync in the loop
+        sender.sync_pinning()
+        receiver.sync_pinning()
 
         return cpu_affected
 
-    def __get_ordered_cpu_list(self, list_to_sort : list, distance_from : list):
-        cpuid_dict = {cpu.get_cpu_id():cpu for cpu in list_to_sort}
-        candidates = cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, from_list=list_to_sort, to_list=distance_from, exclude_max=False, distance_max=50)
-        return [cpuid_dict[cpuid] for cpuid, _ in sorted(candidates.items(), key=lambda item: item[1])]
\ No newline at end of file
+    def __get_ordered_cpu_list(self, list_to_sort : list, distance_from : list, count : int = None):
+        candidates_ordered = cpuset_utils.get_cpus_with_weight(cpuset=self.cpuset, from_list=list_to_sort, to_list=distance_from, exclude_max=False, distance_max=50, top_k=count)
+        return [cpu for cpu, _ in candidates_ordered]
\ No newline at end of file
@@ -20,6 +20,8 @@ class SubsetOversubscription(object):
     get_id()
         Return oversubscription id
     """
+    __slots__ = ('subset',)
+
     def __init__(self, **kwargs):
         req_attributes = ['subset']
         for req_attribute in req_attributes:
@@ -69,7 +71,10 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
         Static oversubscription ratio to apply
     critical_size : int
         VM will start being oversubscribed only after the number of VM reaches the critical_size attribute
+    counts_cache : tuple
+        Last computed (subset version, available, unused) counts
     """
+    __slots__ = ('ratio', 'critical_size', 'counts_cache')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -78,6 +83,7 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
             if req_attribute not in kwargs: raise ValueError('Missing required argument', req_attributes)
             setattr(self, req_attribute, kwargs[req_attribute])
         self.critical_size = 1
+        self.counts_cache = None
 
     def get_available(self, with_new_resources : int = 0):
         """Return the number of virtual resource available
@@ -93,10 +99,8 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
         available : int
             count of available resources
         """
-        with_new_vm = False
-        if with_new_resources>0:
-            with_new_vm = True
-        return self.get_oversubscribed_quantity(quantity=self.subset.get_capacity(), with_new_vm=with_new_vm) - self.subset.get_allocation()
+        available, _ = self.__get_counts() # Static ratio: critical size has no effect
+        return available
 
     def get_oversubscribed_quantity(self, quantity : int, with_new_vm : bool = False):
         """Based on a specific quantity, return oversubscribed equivalent
@@ -114,7 +118,7 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
         quantity : int
             Quantity oversubscribed
         """
-        return quantity*self.__get_effective_ratio(with_new_vm)
+        return quantity*self.ratio
 
     def unused_resources_count(self):
         """Return attributed physical resources which are unused
@@ -125,18 +129,37 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
         unused : int
             count of unused resources
         """
-        available_oversubscribed = self.get_available()
-        unused_cpu = floor(available_oversubscribed/self.__get_effective_ratio())
+        _, unused = self.__get_counts()
+        return unused
 
-        used_cpu = self.subset.get_capacity() - unused_cpu
+    def __get_counts(self):
+        """Return available and unused counts. Computed once per subset version
+        ----------
+
+        Returns
+        -------
+        available : int
+            count of available resources
+        unused : int
+            count of unused resources
+        """
+        version = self.subset.get_version()
+        if (self.counts_cache is not None) and (self.counts_cache[0] == version):
+            return self.counts_cache[1], self.counts_cache[2]
+
+        capacity = self.subset.get_capacity()
+        available_oversubscribed = capacity*self.ratio - self.subset.get_allocation()
+        unused_cpu = floor(available_oversubscribed/self.ratio)
+
+        used_cpu = capacity - unused_cpu
 
         # Test specific case: our unused count floor should not reduce the capacity below the maximum configuration observed
         # Avoid VM to be oversubscribed with themselves
         max_alloc = self.subset.get_max_consumer_allocation()
-        if used_cpu < max_alloc: return max(0, floor(self.subset.get_capacity()-max_alloc))
-    
-        # Generic case
-        return unused_cpu
+        if used_cpu < max_alloc: unused_cpu = max(0, floor(capacity-max_alloc))
+
+        self.counts_cache = (version, available_oversubscribed, unused_cpu)
+        return available_oversubscribed, unused_cpu
 
 
     def get_additional_res_count_required_for_quantity(self, vm : DomainEntity, quantity : float):
@@ -160,10 +183,10 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
         capacity   = self.subset.get_capacity() # Without oversubscription
 
         # Compute new resources needed based on oversubcription ratio
-        available_oversubscribed = self.get_available()
+        available_oversubscribed, _ = self.__get_counts()
 
         missing_oversubscribed   = (request - available_oversubscribed)
-        missing_physical = ceil(missing_oversubscribed/self.__get_effective_ratio(with_new_vm=True)) if missing_oversubscribed > 0 else 0
+        missing_physical = ceil(missing_oversubscribed/self.ratio) if missing_oversubscribed > 0 else 0
         new_capacity = capacity + missing_physical
 
         # Check if new_capacity is enough to fullfil VM request without oversubscribing it with itself
@@ -185,22 +208,6 @@ class SubsetOversubscriptionStatic(SubsetOversubscription):
         """
         return self.ratio
 
-    def __get_effective_ratio(self, with_new_vm : bool = False):
-        """Get oversubscription ratio to apply based on if critical size was reached or not
-        ----------
-
-        Parameters
-        ----------
-        with_new_vm : bool (opt)
-            If a new VM is to be considered while computing if critical size is reached
-
-        Returns
-        -------
-        ratio : float
-           oversubscription
-        """
-        return self.ratio
-
     def is_critical_size_reached(self, with_new_vm : bool = False):
         """Verify if critical size was reached or not
         ----------
@@ -229,11 +236,14 @@ class SubsetOversubscriptionBasedOnPerf(SubsetOversubscription):
 
     Attributes
     ----------
-    ratio : float
-        Static oversubscription ratio to apply
-    critical_size : int
-        VM will start being oversubscribed only after the number of VM reaches the critical_size attribute
+    perf : float
+        Performance margin (in percent) to apply on predicted peak
+    perf_factor : float
+        Multiplier derived from perf
+    predictor : Predictor
+        Predictor used to estimate the peak usage
     """
+    __slots__ = ('perf', 'perf_factor', 'predictor', 'market')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -241,7 +251,13 @@ class SubsetOversubscriptionBasedOnPerf(SubsetOversubscription):
         for req_attribute in req_attributes:
             if req_attribute not in kwargs: raise ValueError('Missing required argument', req_attributes)
             setattr(self, req_attribute, kwargs[req_attribute])
-        self.predictor = PredictorScrooge()
+        self.perf_factor = 1+(self.perf/100)
+        # Quiescence check of the predictor (and its settings) may be selected from the environment
+        predictor_settings = dict()
+        if os.getenv('SCL_QUIESCENCE'): predictor_settings['quiescence'] = os.getenv('SCL_QUIESCENCE')
+        if os.getenv('SCL_QUIESCENCE_CONFIG'): predictor_settings['config'] = float(os.getenv('SCL_QUIESCENCE_CONFIG'))
+        if os.getenv('SCL_QUIESCENCE_THRESHOLD'): predictor_settings['threshold'] = float(os.getenv('SCL_QUIESCENCE_THRESHOLD'))
+        self.predictor = PredictorScrooge(**predictor_settings)
 
     def register_market(self, market : SubsetMarket):
         self.market = market
@@ -258,7 +274,7 @@ class SubsetOversubscriptionBasedOnPerf(SubsetOversubscription):
             return
 
         peak = self.predictor.predict(data=subset_usage_hist, recompute=True)
-        peak_with_constraint =  ceil(peak*(1+(self.perf/100)))
+        peak_with_constraint =  ceil(peak*self.perf_factor)
         
         request = 0
         if peak_with_constraint > self.subset.count_res():
@@ -275,7 +291,7 @@ class SubsetOversubscriptionBasedOnPerf(SubsetOversubscription):
         unused : int
             count of unused resources
         """
-        allocation_max = ceil(self.subset.get_allocation() * (1+(self.perf/100))) # sum of vcpus
+        allocation_max = ceil(self.subset.get_allocation() * self.perf_factor) # sum of vcpus
         if self.subset.get_capacity() > allocation_max:
             return self.subset.get_capacity() - allocation_max
         return 0 # let the market decide
@@ -296,7 +312,7 @@ class SubsetOversubscriptionBasedOnPerf(SubsetOversubscription):
         """
         if(not self.market.is_market_effective(recompute=False)):
             return self.subset.count_res() - self.subset.get_allocation()
-        return self.subset.count_res() - ceil( (1+(self.perf/100)) * self.predictor.predict(data=None, recompute=False))
+        return self.subset.count_res() - ceil(self.perf_factor * self.predictor.predict(data=None, recompute=False))
 
     def get_additional_res_count_required_for_quantity(self, vm : DomainEntity, quantity : float):
         """Return the number of additional physical resource required to deploy specified vm. 
@@ -318,11 +334,8 @@ class SubsetOversubscriptionBasedOnPerf(SubsetOversubscription):
         capacity   = self.subset.get_capacity() # Without oversubscription
         available  = self.get_available(with_new_resources=quantity) # With oversubscription consideration
 
-        new_capacity     = capacity
-        missing_physical = 0
-        if available < quantity:
-            missing_physical = quantity - available
-            new_capacity     = capacity + missing_physical
+        missing_physical = ceil(quantity - available) if available < quantity else 0 # available is already expressed in physical resources
+        new_capacity     = capacity + missing_physical
 
         # Check if new_capacity is enough to fullfil VM request without oversubscribing it with itself
         # E.g. a 32vCPU request should be in a pool with 32 physical CPU, no matter what others VM are in it.